@@ -0,0 +1,6 @@
+import os
+import sys
+
+# app.py refuses to import without keys; tests never reach the Gemini API
+os.environ.setdefault("GEMINI_API_KEYS", "test-key")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
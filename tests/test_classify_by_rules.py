@@ -0,0 +1,52 @@
+import pytest
+
+from app import classify_by_rules
+
+
+def as_tuple(result):
+    return (result.category, result.Merchant, result.Transaction)
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("Your A/c XXXXX4321 debited by Rs.425.50 at Zomato Order #ZMTO12345", ("Food & Drinks", "Zomato", True)),
+    ("Rs.425.50 debited from A/c XX4321 at Zomato. Never share your OTP with anyone.", ("Food & Drinks", "Zomato", True)),
+    ("Rs 200 paid to Ola cabs", ("Travel & Transport", "Ola", True)),
+    ("Rs 250 paid to Uber", ("Travel & Transport", "Uber", True)),
+    ("Rs 99 debited for NETFLIX", ("Entertainment", "Netflix", True)),
+    ("Your card was charged INR 650 at Flipkart", ("Shopping", "Flipkart", True)),
+    ("INR 700 deducted from your account towards Netflix. Never share your OTP", ("Entertainment", "Netflix", True)),
+    ("Your card was charged INR 250 at Zomato. Never share OTP", ("Food & Drinks", "Zomato", True)),
+])
+def test_debits_at_known_merchants(description, expected):
+    assert as_tuple(classify_by_rules(description)) == expected
+
+
+@pytest.mark.parametrize("description", [
+    "123456 is your OTP for login",
+    "Use one-time password 4821 to verify your device",
+])
+def test_otp_messages_without_amount(description):
+    assert as_tuple(classify_by_rules(description)) == ("Miscellaneous", "NONE", False)
+
+
+@pytest.mark.parametrize("description", [
+    # Debit alerts with an OTP footer and verbs the rules don't know
+    "Rs.1500 withdrawn from A/c XX1234 at ATM. Never share your OTP",
+    "Rs.2000 transferred to A/c XX9876. Never share your OTP with anyone",
+    "A debit of Rs.499 on card XX1111. Never share your OTP",
+    "Txn of INR 320 at Swiggy on card XX2222. Never share OTP",
+    # Promotions, deliveries, declines and wallets
+    "Your Flipkart order has been sent for delivery",
+    "Get 50% off on your next purchase at Myntra!",
+    "Zomato Gold payment of Rs 299 was declined; no amount debited",
+    "Rs 250 paid to Ola Money wallet",
+    "Get 50% off on Zomato today!",
+    # Categories that clash with the merchant's usual one
+    "Rs 250 paid to Uber Eats",
+    "Rs 300 paid at Swiggy Instamart",
+    "Rs 500 refund from Flipkart credited to your A/c",
+    # Unknown merchant
+    "Rs 200 paid to Olaf",
+])
+def test_ambiguous_messages_go_to_gemini(description):
+    assert classify_by_rules(description) is None